@@ -30,6 +30,12 @@ class Settings(BaseSettings):
 
     history_file: str = "history.json"
     max_history_items: int = 10
+    # Полный архив запросов (NDJSON, по строке на запись) для экспорта и отчётов
+    archive_file: str = "history_archive.ndjson"
+    export_page_size: int = 1000
+    report_top_n: int = 10
+    # Сколько разных формулировок держать на домен при подсчёте сильных/слабых сторон
+    report_counter_capacity: int = 500
 
     parser_timeout: int = 10
     parser_user_agent: str = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
@@ -1,13 +1,16 @@
 import base64
+from datetime import date
+from typing import Literal, Optional
 
 import uvicorn
-from fastapi import FastAPI, File, HTTPException, UploadFile
+from fastapi import FastAPI, File, Form, HTTPException, Query, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 
 from backend.config import settings
 from backend.models.schemas import (
+    CompetitorReportResponse,
     HistoryResponse,
     ImageAnalysisResponse,
     ParseDemoRequest,
@@ -16,6 +19,7 @@ from backend.models.schemas import (
     TextAnalysisRequest,
     TextAnalysisResponse,
 )
+from backend.services.export_service import export_service
 from backend.services.history_service import history_service
 from backend.services.openai_service import openai_service
 from backend.services.parser_service import parser_service
@@ -44,14 +48,22 @@ async def root():
 async def analyze_text(request: TextAnalysisRequest):
     try:
         analysis = await openai_service.analyze_text(request.text)
-        history_service.add_entry("text", request.text[:100], analysis.summary)
+        history_service.add_entry(
+            "text",
+            request.text[:100],
+            analysis.summary,
+            analysis=analysis.model_dump(),
+        )
         return TextAnalysisResponse(success=True, analysis=analysis)
     except Exception as e:
         return TextAnalysisResponse(success=False, error=str(e))
 
 
 @app.post("/analyze_image", response_model=ImageAnalysisResponse)
-async def analyze_image(file: UploadFile = File(...)):
+async def analyze_image(
+    file: UploadFile = File(...),
+    domain: Optional[str] = Form(None, description="Домен или URL конкурента"),
+):
     allowed = ["image/jpeg", "image/png", "image/gif", "image/webp"]
     if file.content_type not in allowed:
         raise HTTPException(status_code=400, detail=f"Допустимо: {', '.join(allowed)}")
@@ -62,7 +74,11 @@ async def analyze_image(file: UploadFile = File(...)):
             image_b64, mime_type=file.content_type
         )
         history_service.add_entry(
-            "image", f"Изображение: {file.filename}", analysis.description[:120]
+            "image",
+            f"Изображение: {file.filename}",
+            analysis.description[:120],
+            analysis=analysis.model_dump(),
+            domain=domain,
         )
         return ImageAnalysisResponse(success=True, analysis=analysis)
     except Exception as e:
@@ -98,6 +114,8 @@ async def parse_demo(request: ParseDemoRequest):
         "parse",
         f"URL: {request.url}",
         analysis.summary[:120] if analysis.summary else "",
+        analysis=analysis.model_dump(),
+        domain=str(request.url),
     )
     return ParseDemoResponse(success=True, data=data)
 
@@ -114,6 +132,52 @@ async def clear_history():
     return {"success": True}
 
 
+ExportFormat = Literal["ndjson", "csv", "parquet"]
+RequestType = Literal["text", "image", "parse"]
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+@app.get("/export")
+async def export_history(
+    export_format: ExportFormat = Query("ndjson", alias="format"),
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    request_type: Optional[RequestType] = Query(None, alias="type"),
+):
+    if export_format == "parquet" and not export_service.parquet_available():
+        raise HTTPException(
+            status_code=400, detail="Для экспорта в parquet установите pyarrow"
+        )
+    streams = {
+        "ndjson": export_service.stream_ndjson,
+        "csv": export_service.stream_csv,
+        "parquet": export_service.stream_parquet,
+    }
+    return StreamingResponse(
+        streams[export_format](date_from, date_to, request_type),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="history.{export_format}"'
+        },
+    )
+
+
+@app.get("/report", response_model=CompetitorReportResponse)
+def competitor_report(
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    request_type: Optional[RequestType] = Query(None, alias="type"),
+):
+    # Синхронный обработчик: FastAPI выполнит обход архива в пуле потоков
+    domains = export_service.build_report(date_from, date_to, request_type)
+    return CompetitorReportResponse(domains=domains, total=len(domains))
+
+
 @app.get("/health")
 async def health():
     return {"status": "healthy", "service": "competitor-monitor"}
@@ -66,3 +66,29 @@ class HistoryResponse(BaseModel):
     items: List[HistoryItem]
     total: int
 
+
+class TrendPoint(BaseModel):
+    date: Optional[str] = None
+    count: int
+    design_score: Optional[float] = None
+    visual_style_score: Optional[float] = None
+
+
+class RecurringItem(BaseModel):
+    text: str
+    count: int
+
+
+class DomainReport(BaseModel):
+    domain: str
+    records: int
+    avg_design_score: Optional[float] = None
+    avg_visual_style_score: Optional[float] = None
+    trend: List[TrendPoint] = []
+    top_strengths: List[RecurringItem] = []
+    top_weaknesses: List[RecurringItem] = []
+
+
+class CompetitorReportResponse(BaseModel):
+    domains: List[DomainReport]
+    total: int
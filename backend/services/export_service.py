@@ -0,0 +1,230 @@
+import csv
+import io
+import json
+import tempfile
+from collections import Counter, defaultdict
+from datetime import date
+from typing import Dict, Iterator, List, Optional
+
+from backend.config import settings
+from backend.services.history_service import history_service
+
+EXPORT_COLUMNS = [
+    "created_at",
+    "request_type",
+    "request_summary",
+    "response_summary",
+    "domain",
+    "design_score",
+    "visual_style_score",
+    "strengths",
+    "weaknesses",
+    "analysis",
+]
+
+
+def _score(value) -> Optional[int]:
+    """Оценка из архива: только целое число, иначе None (архив не типизирован)."""
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    return None
+
+
+def _flatten(record: dict) -> dict:
+    analysis = record.get("analysis") or {}
+    return {
+        "created_at": record.get("created_at"),
+        "request_type": record.get("request_type"),
+        "request_summary": record.get("request_summary"),
+        "response_summary": record.get("response_summary"),
+        "domain": record.get("domain"),
+        "design_score": _score(analysis.get("design_score")),
+        "visual_style_score": _score(analysis.get("visual_style_score")),
+        "strengths": analysis.get("strengths") or [],
+        "weaknesses": analysis.get("weaknesses") or [],
+        "analysis": json.dumps(analysis, ensure_ascii=False) if analysis else None,
+    }
+
+
+def _normalize_phrase(text) -> str:
+    if not isinstance(text, str):
+        return ""
+    return " ".join(text.split()).casefold()
+
+
+def _prune(counter: Counter, capacity: int):
+    """Оставляет только самые частые ключи, чтобы счётчик не рос с архивом."""
+    if len(counter) > 2 * capacity:
+        kept = counter.most_common(capacity)
+        counter.clear()
+        counter.update(dict(kept))
+
+
+class ExportService:
+    def parquet_available(self) -> bool:
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def stream_ndjson(
+        self,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        request_type: Optional[str] = None,
+    ) -> Iterator[bytes]:
+        for page in history_service.iter_pages(date_from, date_to, request_type):
+            yield "".join(
+                json.dumps(record, ensure_ascii=False) + "\n" for record in page
+            ).encode("utf-8")
+
+    def stream_csv(
+        self,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        request_type: Optional[str] = None,
+    ) -> Iterator[bytes]:
+        buf = io.StringIO()
+        writer = csv.DictWriter(buf, fieldnames=EXPORT_COLUMNS)
+        # BOM, чтобы Excel корректно открывал кириллицу
+        yield "\ufeff".encode("utf-8")
+        writer.writeheader()
+        for page in history_service.iter_pages(date_from, date_to, request_type):
+            for record in page:
+                row = _flatten(record)
+                row["strengths"] = "; ".join(row["strengths"])
+                row["weaknesses"] = "; ".join(row["weaknesses"])
+                writer.writerow(row)
+            yield buf.getvalue().encode("utf-8")
+            buf.seek(0)
+            buf.truncate(0)
+        if buf.tell():
+            yield buf.getvalue().encode("utf-8")
+
+    def stream_parquet(
+        self,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        request_type: Optional[str] = None,
+        chunk_size: int = 64 * 1024,
+    ) -> Iterator[bytes]:
+        # Parquet пишет метаданные в конец файла, поэтому row group'ы складываются
+        # во временный файл на диске, а затем он отдаётся частями.
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        types = {
+            "design_score": pa.int64(),
+            "visual_style_score": pa.int64(),
+            "strengths": pa.list_(pa.string()),
+            "weaknesses": pa.list_(pa.string()),
+        }
+        schema = pa.schema(
+            [(name, types.get(name, pa.string())) for name in EXPORT_COLUMNS]
+        )
+        with tempfile.TemporaryFile() as tmp:
+            with pq.ParquetWriter(tmp, schema) as writer:
+                for page in history_service.iter_pages(date_from, date_to, request_type):
+                    rows = [_flatten(record) for record in page]
+                    writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+            tmp.seek(0)
+            while chunk := tmp.read(chunk_size):
+                yield chunk
+
+    def build_report(
+        self,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        request_type: Optional[str] = None,
+        top_n: Optional[int] = None,
+    ) -> List[dict]:
+        """Агрегирует оценки и повторяющиеся сильные/слабые стороны по доменам.
+
+        Записи без домена (текст, изображения без указанного сайта) в отчёт
+        не попадают. Архив обходится постранично; память ограничена числом
+        доменов × (дней + report_counter_capacity). Счётчики формулировок
+        после каждой страницы подрезаются до самых частых, поэтому редкие
+        формулировки считаются приблизительно.
+        """
+        top_n = top_n or settings.report_top_n
+        capacity = max(settings.report_counter_capacity, top_n)
+        records: Counter = Counter()
+        # domain -> day -> [count, design_sum, design_n, visual_sum, visual_n]
+        daily: Dict[str, Dict[str, List[int]]] = defaultdict(
+            lambda: defaultdict(lambda: [0, 0, 0, 0, 0])
+        )
+        strengths: Dict[str, Counter] = defaultdict(Counter)
+        weaknesses: Dict[str, Counter] = defaultdict(Counter)
+
+        for page in history_service.iter_pages(date_from, date_to, request_type):
+            for record in page:
+                domain = record.get("domain")
+                if not domain:
+                    continue
+                analysis = record.get("analysis") or {}
+                bucket = daily[domain][(record.get("created_at") or "")[:10]]
+                bucket[0] += 1
+                design = _score(analysis.get("design_score"))
+                if design is not None:
+                    bucket[1] += design
+                    bucket[2] += 1
+                visual = _score(analysis.get("visual_style_score"))
+                # 0 — значение по умолчанию, когда модель не вернула оценку
+                if visual:
+                    bucket[3] += visual
+                    bucket[4] += 1
+                records[domain] += 1
+                for counters, key in (
+                    (strengths, "strengths"),
+                    (weaknesses, "weaknesses"),
+                ):
+                    phrases = map(_normalize_phrase, analysis.get(key) or [])
+                    counters[domain].update(p for p in phrases if p)
+            for counters in (strengths, weaknesses):
+                for counter in counters.values():
+                    _prune(counter, capacity)
+
+        report = []
+        for domain, total in records.most_common():
+            trend = []
+            design_sum = design_n = visual_sum = visual_n = 0
+            for day in sorted(daily[domain]):
+                count, d_sum, d_n, v_sum, v_n = daily[domain][day]
+                design_sum += d_sum
+                design_n += d_n
+                visual_sum += v_sum
+                visual_n += v_n
+                trend.append(
+                    {
+                        "date": day or None,
+                        "count": count,
+                        "design_score": round(d_sum / d_n, 2) if d_n else None,
+                        "visual_style_score": round(v_sum / v_n, 2) if v_n else None,
+                    }
+                )
+            report.append(
+                {
+                    "domain": domain,
+                    "records": total,
+                    "avg_design_score": (
+                        round(design_sum / design_n, 2) if design_n else None
+                    ),
+                    "avg_visual_style_score": (
+                        round(visual_sum / visual_n, 2) if visual_n else None
+                    ),
+                    "trend": trend,
+                    "top_strengths": [
+                        {"text": t, "count": c}
+                        for t, c in strengths[domain].most_common(top_n)
+                    ],
+                    "top_weaknesses": [
+                        {"text": t, "count": c}
+                        for t, c in weaknesses[domain].most_common(top_n)
+                    ],
+                }
+            )
+        return report
+
+
+export_service = ExportService()
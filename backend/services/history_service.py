@@ -1,7 +1,26 @@
 import json
+from datetime import date, datetime, timezone
 from pathlib import Path
+from typing import Iterator, List, Optional
+from urllib.parse import urlparse
 
-from backend.config import settings
+from backend.config import logger, settings
+
+
+def extract_domain(value: Optional[str]) -> Optional[str]:
+    """Приводит URL или имя хоста к домену без www для группировки в отчёте."""
+    value = (value or "").strip()
+    if not value:
+        return None
+    if "://" not in value:
+        value = f"http://{value}"
+    try:
+        host = urlparse(value).hostname
+    except ValueError:
+        return None
+    if not host:
+        return None
+    return host[4:] if host.startswith("www.") else host
 
 
 class HistoryService:
@@ -9,22 +28,55 @@ class HistoryService:
         self.file = Path(settings.history_file)
         if not self.file.exists():
             self.file.write_text("[]", encoding="utf-8")
+        self.archive = Path(settings.archive_file)
+        if not self.archive.exists():
+            self._seed_archive()
+
+    def _seed_archive(self):
+        # Переносим уже накопленную историю (без дат) в архив в хронологическом порядке
+        with self.archive.open("w", encoding="utf-8") as f:
+            for item in reversed(self.get_history()):
+                summary = item.get("request_summary", "")
+                domain = None
+                if item.get("request_type") == "parse" and summary.startswith("URL: "):
+                    domain = extract_domain(summary[len("URL: "):])
+                record = {"created_at": None, **item, "domain": domain, "analysis": None}
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def add_entry(
+        self,
+        request_type: str,
+        request_summary: str,
+        response_summary: str,
+        analysis: Optional[dict] = None,
+        domain: Optional[str] = None,
+    ):
+        entry = {
+            "request_type": request_type,
+            "request_summary": request_summary,
+            "response_summary": response_summary,
+        }
+        record = {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            **entry,
+            "domain": extract_domain(domain),
+            "analysis": analysis,
+        }
 
-    def add_entry(self, request_type: str, request_summary: str, response_summary: str):
         data = self.get_history()
-        data.insert(
-            0,
-            {
-                "request_type": request_type,
-                "request_summary": request_summary,
-                "response_summary": response_summary,
-            },
-        )
+        data.insert(0, entry)
         data = data[: settings.max_history_items]
         self.file.write_text(
             json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8"
         )
 
+        # Сбой архива не должен ломать уже выполненный анализ
+        try:
+            with self.archive.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except (OSError, TypeError, ValueError) as e:
+            logger.error(f"Не удалось записать в архив {self.archive}: {e}")
+
     def get_history(self):
         try:
             return json.loads(self.file.read_text(encoding="utf-8"))
@@ -34,6 +86,49 @@ class HistoryService:
     def clear_history(self):
         self.file.write_text("[]", encoding="utf-8")
 
+    def iter_records(
+        self,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        request_type: Optional[str] = None,
+    ) -> Iterator[dict]:
+        """Построчно читает архив, не загружая его целиком. Границы дат включительные."""
+        lo = date_from.isoformat() if date_from else None
+        hi = date_to.isoformat() if date_to else None
+        if not self.archive.exists():
+            return
+        with self.archive.open("r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if request_type and record.get("request_type") != request_type:
+                    continue
+                if lo or hi:
+                    day = (record.get("created_at") or "")[:10]
+                    if not day or (lo and day < lo) or (hi and day > hi):
+                        continue
+                yield record
 
-history_service = HistoryService()
+    def iter_pages(
+        self,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        request_type: Optional[str] = None,
+        page_size: Optional[int] = None,
+    ) -> Iterator[List[dict]]:
+        size = page_size or settings.export_page_size
+        page: List[dict] = []
+        for record in self.iter_records(date_from, date_to, request_type):
+            page.append(record)
+            if len(page) >= size:
+                yield page
+                page = []
+        if page:
+            yield page
 
+
+history_service = HistoryService()
@@ -97,6 +97,8 @@ document.getElementById("analyze-image-btn").onclick = async () => {
   el.textContent = "Загрузка...";
   const form = new FormData();
   form.append("file", file);
+  const domain = document.getElementById("image-domain-input").value.trim();
+  if (domain) form.append("domain", domain);
   const res = await fetch(api("/analyze_image"), { method: "POST", body: form });
   const data = await res.json();
   if (!data.success) {
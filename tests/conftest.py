@@ -0,0 +1,37 @@
+import json
+
+import pytest
+
+from backend.config import settings
+from backend.services.history_service import history_service
+
+
+@pytest.fixture
+def archive(tmp_path, monkeypatch):
+    monkeypatch.setattr(history_service, "file", tmp_path / "history.json")
+    monkeypatch.setattr(history_service, "archive", tmp_path / "archive.ndjson")
+    monkeypatch.setattr(settings, "export_page_size", 2)
+    history_service.clear_history()
+    history_service.archive.write_text("", encoding="utf-8")
+    return history_service
+
+
+@pytest.fixture
+def write_archive(archive):
+    def write(records):
+        with archive.archive.open("a", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    return write
+
+
+def make_record(created_at, request_type="parse", domain="okna.ru", **analysis):
+    return {
+        "created_at": created_at,
+        "request_type": request_type,
+        "request_summary": "req",
+        "response_summary": "resp",
+        "domain": domain,
+        "analysis": analysis or None,
+    }
@@ -0,0 +1,197 @@
+import io
+import json
+from collections import Counter
+from datetime import date
+
+import pytest
+
+from backend.services.export_service import EXPORT_COLUMNS, _prune, export_service
+
+from tests.conftest import make_record
+
+
+def test_stream_csv_writes_bom_and_header_on_empty_archive(archive):
+    data = b"".join(export_service.stream_csv()).decode("utf-8")
+
+    assert data == "\ufeff" + ",".join(EXPORT_COLUMNS) + "\r\n"
+
+
+def test_stream_csv_writes_rows(archive, write_archive):
+    write_archive(
+        [
+            make_record(
+                "2026-01-01T00:00:00+00:00",
+                strengths=["цены", "сервис"],
+                weaknesses=["сайт"],
+                design_score=7,
+            ),
+            make_record("2026-01-02T00:00:00+00:00", request_type="text", domain=None),
+        ]
+    )
+
+    lines = b"".join(export_service.stream_csv(request_type="parse")).decode(
+        "utf-8-sig"
+    ).splitlines()
+
+    assert len(lines) == 2
+    assert lines[1].startswith(
+        "2026-01-01T00:00:00+00:00,parse,req,resp,okna.ru,7,,цены; сервис,сайт,"
+    )
+
+
+def test_stream_ndjson_round_trips_filtered_records(archive, write_archive):
+    records = [
+        make_record(f"2026-01-0{i}T00:00:00+00:00", design_score=i) for i in range(1, 6)
+    ]
+    write_archive(records)
+
+    chunks = list(export_service.stream_ndjson(date_from=date(2026, 1, 3)))
+    lines = b"".join(chunks).decode("utf-8").splitlines()
+
+    assert len(chunks) == 2
+    assert [json.loads(line) for line in lines] == records[2:]
+
+
+def test_build_report_aggregates_per_domain_and_day(archive, write_archive):
+    write_archive(
+        [
+            make_record(
+                "2026-01-01T09:00:00+00:00",
+                design_score=6,
+                strengths=["Низкие  цены"],
+                weaknesses=["Нет  доставки "],
+            ),
+            make_record(
+                "2026-01-01T18:00:00+00:00",
+                design_score=8,
+                strengths=["низкие цены", "Гарантия"],
+            ),
+            make_record(
+                "2026-01-02T00:00:00+00:00",
+                request_type="image",
+                visual_style_score=9,
+            ),
+            # 0 — модель не вернула оценку, в среднее не входит
+            make_record(
+                "2026-01-02T12:00:00+00:00",
+                request_type="image",
+                visual_style_score=0,
+            ),
+            make_record("2026-01-02T00:00:00+00:00", domain="other.ru", design_score=4),
+            # без домена — не конкурент
+            make_record(
+                "2026-01-02T00:00:00+00:00",
+                request_type="text",
+                domain=None,
+                strengths=["x"],
+            ),
+        ]
+    )
+
+    report = export_service.build_report()
+
+    assert [d["domain"] for d in report] == ["okna.ru", "other.ru"]
+    okna = report[0]
+    assert okna["records"] == 4
+    assert okna["avg_design_score"] == 7.0
+    assert okna["avg_visual_style_score"] == 9.0
+    assert okna["trend"] == [
+        {
+            "date": "2026-01-01",
+            "count": 2,
+            "design_score": 7.0,
+            "visual_style_score": None,
+        },
+        {
+            "date": "2026-01-02",
+            "count": 2,
+            "design_score": None,
+            "visual_style_score": 9.0,
+        },
+    ]
+    assert okna["top_strengths"] == [
+        {"text": "низкие цены", "count": 2},
+        {"text": "гарантия", "count": 1},
+    ]
+    assert okna["top_weaknesses"] == [{"text": "нет доставки", "count": 1}]
+    assert report[1]["avg_design_score"] == 4.0
+
+
+def test_build_report_ignores_non_integer_scores(archive, write_archive):
+    write_archive(
+        [
+            make_record("2026-01-01T00:00:00+00:00", design_score=7.5),
+            make_record("2026-01-01T00:00:00+00:00", design_score=True),
+            make_record("2026-01-01T00:00:00+00:00", design_score=5),
+        ]
+    )
+
+    (okna,) = export_service.build_report()
+
+    assert okna["records"] == 3
+    assert okna["avg_design_score"] == 5.0
+
+
+def test_prune_keeps_most_common_keys():
+    counter = Counter({"a": 5, "b": 3, "c": 1, "d": 1, "e": 1})
+    _prune(counter, 2)
+    assert counter == Counter({"a": 5, "b": 3})
+
+    small = Counter({"a": 1, "b": 1, "c": 1, "d": 1})
+    _prune(small, 2)
+    assert len(small) == 4
+
+
+def test_build_report_prunes_rare_phrases_between_pages(
+    archive, write_archive, monkeypatch
+):
+    from backend.config import settings
+
+    monkeypatch.setattr(settings, "export_page_size", 1)
+    monkeypatch.setattr(settings, "report_counter_capacity", 3)
+    write_archive(
+        [
+            make_record(
+                None, strengths=["a", "a", "a", "b", "b", "d", "e", "f", "g", "c"]
+            ),
+            make_record(None, strengths=["c", "c"]),
+        ]
+    )
+
+    (okna,) = export_service.build_report(top_n=3)
+
+    # «c» вытеснен после первой страницы (7 ключей > 2 × 3), поэтому из трёх
+    # упоминаний посчитаны только два
+    assert okna["top_strengths"] == [
+        {"text": "a", "count": 3},
+        {"text": "b", "count": 2},
+        {"text": "c", "count": 2},
+    ]
+
+
+def test_stream_parquet_writes_all_pages(archive):
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    for i in range(5):
+        archive.add_entry(
+            "parse",
+            f"URL: https://example.com/{i}",
+            "summary",
+            analysis={"strengths": ["цены"], "weaknesses": [], "design_score": i},
+            domain="https://www.example.com/",
+        )
+    archive.add_entry(
+        "parse", "URL: https://example.com/x", "s", analysis={"design_score": 7.5}
+    )
+    archive.add_entry("image", "Изображение: a.png", "desc", analysis={})
+
+    data = b"".join(
+        export_service.stream_parquet(request_type="parse", chunk_size=128)
+    )
+    table = pq.read_table(io.BytesIO(data))
+
+    assert table.column_names == EXPORT_COLUMNS
+    assert table.num_rows == 6
+    assert table.column("domain").to_pylist() == ["example.com"] * 5 + [None]
+    assert table.column("design_score").to_pylist() == [0, 1, 2, 3, 4, None]
+    assert table.column("strengths").to_pylist() == [["цены"]] * 5 + [[]]
@@ -0,0 +1,109 @@
+import json
+from datetime import date
+
+from backend.services.history_service import extract_domain
+
+from tests.conftest import make_record
+
+
+def test_extract_domain_normalises_hosts():
+    assert extract_domain("https://www.Okna.ru/catalog?x=1") == "okna.ru"
+    assert extract_domain("okna.ru") == "okna.ru"
+    assert extract_domain("  WWW.okna.ru  ") == "okna.ru"
+    assert extract_domain("") is None
+    assert extract_domain(None) is None
+
+
+def test_extract_domain_ignores_unparsable_input():
+    assert extract_domain("http://[bad") is None
+
+
+def test_add_entry_writes_history_and_archive(archive):
+    archive.add_entry(
+        "image", "Изображение: a.png", "desc", analysis={"x": 1}, domain="www.a.ru"
+    )
+
+    assert archive.get_history() == [
+        {
+            "request_type": "image",
+            "request_summary": "Изображение: a.png",
+            "response_summary": "desc",
+        }
+    ]
+    (record,) = archive.iter_records()
+    assert record["domain"] == "a.ru"
+    assert record["analysis"] == {"x": 1}
+    assert record["created_at"][:10] == date.today().isoformat()
+
+
+def test_add_entry_survives_bad_domain_and_archive_failure(archive, tmp_path):
+    archive.add_entry("image", "img", "desc", domain="http://[bad")
+    (record,) = archive.iter_records()
+    assert record["domain"] is None
+
+    archive.archive = tmp_path / "missing" / "archive.ndjson"
+    archive.add_entry("text", "txt", "summary")
+    assert [i["request_type"] for i in archive.get_history()] == ["text", "image"]
+
+
+def test_iter_records_filters_by_inclusive_dates_and_type(archive, write_archive):
+    write_archive(
+        [
+            make_record(None),
+            make_record("2026-01-01T10:00:00+00:00"),
+            make_record("2026-01-02T23:59:59+00:00", request_type="image"),
+            make_record("2026-01-03T00:00:00+00:00"),
+            make_record("2026-01-04T00:00:00+00:00"),
+        ]
+    )
+
+    def days(**kwargs):
+        return [r["created_at"] for r in archive.iter_records(**kwargs)]
+
+    assert len(days()) == 5
+    assert days(date_from=date(2026, 1, 2), date_to=date(2026, 1, 3)) == [
+        "2026-01-02T23:59:59+00:00",
+        "2026-01-03T00:00:00+00:00",
+    ]
+    assert days(date_to=date(2026, 1, 1)) == ["2026-01-01T10:00:00+00:00"]
+    assert days(request_type="image") == ["2026-01-02T23:59:59+00:00"]
+    assert days(request_type="parse", date_from=date(2026, 1, 3)) == [
+        "2026-01-03T00:00:00+00:00",
+        "2026-01-04T00:00:00+00:00",
+    ]
+
+
+def test_iter_pages_respects_page_size(archive, write_archive):
+    write_archive([make_record(f"2026-01-0{i}T00:00:00+00:00") for i in range(1, 6)])
+
+    assert [len(page) for page in archive.iter_pages()] == [2, 2, 1]
+    assert [len(page) for page in archive.iter_pages(page_size=4)] == [4, 1]
+
+
+def test_seed_archive_migrates_history_oldest_first(archive):
+    archive.file.write_text(
+        json.dumps(
+            [
+                {
+                    "request_type": "parse",
+                    "request_summary": "URL: https://www.okna.ru/",
+                    "response_summary": "new",
+                },
+                {
+                    "request_type": "text",
+                    "request_summary": "Наши окна",
+                    "response_summary": "old",
+                },
+            ],
+            ensure_ascii=False,
+        ),
+        encoding="utf-8",
+    )
+
+    archive._seed_archive()
+    records = list(archive.iter_records())
+
+    assert [r["response_summary"] for r in records] == ["old", "new"]
+    assert [r["domain"] for r in records] == [None, "okna.ru"]
+    assert all(r["created_at"] is None and r["analysis"] is None for r in records)
+    assert list(archive.iter_records(date_from=date(2000, 1, 1))) == []